@@ -3,9 +3,208 @@ import asyncio
 import sys
 import os
 import time
-from playwright.async_api import async_playwright
+from capture_cache import CaptureCache
+from range_assembly import RangeAssembler, content_encoding
+
+# Per-page time budget for the lazy-load trigger, and how long the network must stay
+# quiet (no new requests, nothing left to force) before we consider the page settled
+LAZY_LOAD_BUDGET_MS = int(os.environ.get("LAZY_LOAD_BUDGET_MS", 20000))
+LAZY_LOAD_QUIET_MS = 1500
+
+# Installed once per page: a MutationObserver collects lazy elements as they are added
+# (including ones that appear while we scroll), and an IntersectionObserver drops the
+# ones the browser already started loading on its own.
+LAZY_LOAD_SETUP_JS = """
+() => {
+    if (window.__lazyLoad) return;
+    const SELECTOR = 'img[loading="lazy"], iframe[loading="lazy"], [data-src], [data-srcset], [data-lazy_src], [data-lazy-src], [data-background]';
+    const state = window.__lazyLoad = { pending: new Set(), seen: new WeakSet(), forced: 0 };
+    const visible = new IntersectionObserver((items) => {
+        for (const item of items) {
+            if (item.isIntersecting) {
+                state.pending.delete(item.target);
+                visible.unobserve(item.target);
+            }
+        }
+    });
+    state.collect = (root) => {
+        if (!root.querySelectorAll) return;
+        const found = root.matches && root.matches(SELECTOR) ? [root] : [];
+        for (const el of [...found, ...root.querySelectorAll(SELECTOR)]) {
+            if (state.seen.has(el)) continue;
+            state.seen.add(el);
+            state.pending.add(el);
+            visible.observe(el);
+        }
+    };
+    new MutationObserver((mutations) => {
+        for (const m of mutations) m.addedNodes.forEach((node) => state.collect(node));
+    }).observe(document.documentElement, { childList: true, subtree: true });
+    state.collect(document);
+}
+"""
+
+# Forces every pending element to load (eager loading, data-* -> real attributes), then
+# jumps to each one so scroll-driven loaders fire. Each jump waits two animation frames so
+# the browser actually renders that position; the jumps stop at the deadline passed in (ms),
+# and the forced attributes alone still load whatever was skipped. Finally jumps to the
+# bottom so infinite-scroll content gets appended. Returns how many elements were forced.
+LAZY_LOAD_STEP_JS = """
+async (remainingMs) => {
+    const deadline = performance.now() + remainingMs;
+    // Fall back to a timer where animation frames are throttled (hidden pages)
+    const nextFrame = () => new Promise((resolve) => {
+        requestAnimationFrame(() => requestAnimationFrame(resolve));
+        setTimeout(resolve, 100);
+    });
+    const state = window.__lazyLoad;
+    const batch = [...state.pending];
+    state.pending.clear();
+    for (const el of batch) {
+        if (el.getAttribute('loading') === 'lazy') el.setAttribute('loading', 'eager');
+        const src = el.dataset.src || el.dataset.lazy_src || el.dataset.lazySrc;
+        if (src && el.getAttribute('src') !== src) el.setAttribute('src', src);
+        if (el.dataset.srcset && el.getAttribute('srcset') !== el.dataset.srcset) el.setAttribute('srcset', el.dataset.srcset);
+        if (el.dataset.background) el.style.backgroundImage = `url("${el.dataset.background}")`;
+    }
+    state.forced += batch.length;
+    for (const el of batch) {
+        if (performance.now() >= deadline) break;
+        if (!el.isConnected) continue;
+        el.scrollIntoView({ block: 'center', behavior: 'instant' });
+        await nextFrame();
+    }
+    window.scrollTo({ top: document.body.scrollHeight, behavior: 'instant' });
+    await nextFrame();
+    return batch.length;
+}
+"""
+
+# Request types lazy loading produces: images, video/audio, fonts, and iframe documents.
+# Scripts, XHR/fetch and WebSocket traffic from a running game don't count.
+LAZY_RESOURCE_TYPES = ("image", "media", "font")
+
+def is_lazy_resource(page, request):
+    if request.resource_type in LAZY_RESOURCE_TYPES:
+        return True
+    try:
+        return request.resource_type == "document" and request.frame != page.main_frame
+    except Exception:
+        # Service worker requests have no frame
+        return False
+
+async def trigger_lazy_load(page, budget_ms=LAZY_LOAD_BUDGET_MS):
+    """Make lazy-loaded content load without stepping through the page pixel by pixel.
+
+    Repeats force-and-jump rounds until a quiet window passes with nothing new to force
+    and no new lazy resources (images, media, fonts, iframes at URLs not loaded before),
+    or the time budget runs out. Returns the number of new resources it surfaced.
+    """
+    start = time.monotonic()
+    forced_total = 0
+    budget_hit = True
+    known = set()
+    surfaced = [0]
+    def on_request(request):
+        if request.url not in known and is_lazy_resource(page, request):
+            known.add(request.url)
+            surfaced[0] += 1
+    page.on("request", on_request)
+
+    try:
+        # Resources the page already loaded are not news when they are requested again
+        known.update(await page.evaluate("() => performance.getEntriesByType('resource').map((e) => e.name)"))
+        await page.evaluate(LAZY_LOAD_SETUP_JS)
+        while True:
+            remaining_ms = budget_ms - (time.monotonic() - start) * 1000
+            if remaining_ms <= 0:
+                break
+            before = surfaced[0]
+            forced = await page.evaluate(LAZY_LOAD_STEP_JS, remaining_ms)
+            forced_total += forced
+            await page.wait_for_timeout(LAZY_LOAD_QUIET_MS)
+            if forced == 0 and surfaced[0] == before:
+                budget_hit = False
+                break
+    except Exception as e:
+        print(f"Lazy-load trigger stopped early: {e}")
+        budget_hit = False
+    finally:
+        page.remove_listener("request", on_request)
+
+    elapsed = time.monotonic() - start
+    note = " (time budget reached)" if budget_hit else ""
+    print(f"Lazy-load trigger: forced {forced_total} elements, surfaced {surfaced[0]} new resources in {elapsed:.1f}s{note}")
+    return surfaced[0]
+
+async def handle_route(route, cache, assembler):
+    """Route every request through here: serve unchanged GETs from the on-disk cache
+    (revalidating first) and tee 206 ranges / Unity build files into the assembler.
+
+    Fulfilled responses are recorded into the HAR just like network ones.
+    """
+    request = route.request
+    if request.method != "GET":
+        await route.continue_()
+        return
+
+    # Range requests are never served from the cache; their parts go to the assembler
+    entry = cache.lookup(request.url) if cache and "range" not in request.headers else None
+    headers = dict(request.headers)
+    if entry:
+        headers.update(cache.conditional_headers(entry))
+
+    try:
+        response = await route.fetch(headers=headers)
+    except Exception as e:
+        print(f"Route fetch failed for {request.url}, passing through: {e}")
+        await route.continue_()
+        return
+
+    # From here on the cache and assembler are best-effort: a failure in either must
+    # never leave the route unhandled, or the browser request hangs until it times out
+    if response.status == 304 and entry:
+        try:
+            body = cache.read(entry)
+        except Exception as e:
+            print(f"Cache read failed for {request.url}, refetching: {e}")
+            await route.continue_()
+            return
+        cache.hits += 1
+        if entry.get("content_encoding") == "identity":
+            feed_assembler(assembler, request.url, entry["status"], entry["headers"], body)
+        await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+        return
+
+    try:
+        body = await response.body()
+    except Exception as e:
+        print(f"Could not read body for {request.url}, passing through: {e}")
+        await route.continue_()
+        return
+
+    if cache and response.status == 200 and "range" not in request.headers:
+        try:
+            if cache.store(request.url, response.status, response.headers, body):
+                cache.misses += 1
+        except Exception as e:
+            print(f"Cache store failed for {request.url}: {e}")
+    # response.body() is already decoded, so a content-encoded .br/.gz would be written with
+    # the wrong bytes; leave those to the curl fallback
+    if content_encoding(response.headers) == "identity":
+        feed_assembler(assembler, request.url, response.status, response.headers, body)
+    await route.fulfill(response=response, body=body)
+
+def feed_assembler(assembler, url, status, headers, body):
+    try:
+        assembler.add_response(url, status, headers, body)
+    except Exception as e:
+        print(f"Range reassembly failed for {url}: {e}")
+
+async def run(url, output_file="capture.har", use_cache=True):
+    # Playwright is slow to import; only pay for it when a capture actually runs
+    from playwright.async_api import async_playwright
 
-async def run(url, output_file="capture.har"):
     async with async_playwright() as p:
         # Launch Firefox
         print(f"Launching Firefox...")
@@ -22,8 +221,12 @@ async def run(url, output_file="capture.har"):
 
         page = await context.new_page()
 
-        # Disable cache to ensure we get fresh assets
-        await page.route("**/*", lambda route: route.continue_())
+        # Serve unchanged assets from the on-disk cache (revalidated via ETag/Last-Modified)
+        # and reassemble partial/large binaries into manual_downloads as they stream past.
+        # The browser cache stays bypassed because every request goes through this route.
+        cache = CaptureCache() if use_cache else None
+        assembler = RangeAssembler()
+        await page.route("**/*", lambda route: handle_route(route, cache, assembler))
         
         print(f"Navigating to {url}...")
         try:
@@ -115,40 +318,28 @@ async def run(url, output_file="capture.har"):
         except Exception as e:
             print(f"Unity interaction note: {e}")
 
-        print("Page loaded. Starting auto-scroll to trigger lazy loading...")
-        
-        # Auto-scroll function
-        await page.evaluate("""
-            async () => {
-                await new Promise((resolve) => {
-                    let totalHeight = 0;
-                    let distance = 100;
-                    let timer = setInterval(() => {
-                        let scrollHeight = document.body.scrollHeight;
-                        window.scrollBy(0, distance);
-                        totalHeight += distance;
-
-                        if(totalHeight >= scrollHeight - window.innerHeight){
-                            clearInterval(timer);
-                            resolve();
-                        }
-                    }, 100);
-                });
-            }
-        """)
+        print("Page loaded. Triggering lazy-loaded content...")
+        await trigger_lazy_load(page)
         
         # Wait a bit after scrolling for any final assets to load
-        print("Scroll complete. Waiting for trailing network activity...")
+        print("Lazy loading complete. Waiting for trailing network activity...")
         await page.wait_for_timeout(5000)
 
         # Close context to ensure HAR is saved
         await context.close()
         await browser.close()
+
+        if cache:
+            cache.save()
         
         print(f"Capture complete! Saved to: {output_file}")
         
+        for url, state in assembler.files.items():
+            print(f"Incomplete ranges for {url}: {state['covered']} of {state['total']}")
+
         # 4. Post-Capture: Manually fetch binary files (WASM/Data) if we know the URL
-        # The HAR often misses strict binary streams or partial content
+        # The HAR often misses strict binary streams or partial content. Anything the
+        # route handler already reassembled is skipped, so only true misses are refetched.
         if game_iframe_url:
             print("Attempting manual fetch of potential missing binaries (Data/Wasm)...")
             # Construct base URL from iframe URL
@@ -174,6 +365,9 @@ async def run(url, output_file="capture.har"):
             for fname in files_to_fetch:
                 file_url = f"{build_url}/{fname}"
                 dest_path = os.path.join(manual_dir, urllib.parse.unquote(fname))
+                if file_url in assembler.completed:
+                    print(f"Already reassembled during capture: {dest_path}")
+                    continue
                 print(f"Downloading {fname} from {file_url}...")
                 
                 # Use curl for reliability
@@ -186,11 +380,12 @@ async def run(url, output_file="capture.har"):
         print(f"You can now run: python3 extract_har.py {output_file}")
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python3 better_capture.py <url> [output_filename]")
+    args = [a for a in sys.argv[1:] if a != "--no-cache"]
+    if len(args) < 1:
+        print("Usage: python3 better_capture.py <url> [output_filename] [--no-cache]")
         sys.exit(1)
         
-    target_url = sys.argv[1]
-    output_har = sys.argv[2] if len(sys.argv) > 2 else "capture.har"
+    target_url = args[0]
+    output_har = args[1] if len(args) > 1 else "capture.har"
     
-    asyncio.run(run(target_url, output_har))
+    asyncio.run(run(target_url, output_har, use_cache="--no-cache" not in sys.argv))
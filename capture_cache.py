@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import time
+
+# Persistent on-disk HTTP cache used by better_capture.py's route handler.
+# Bodies are stored once per content hash under blobs/, and index.json maps
+# each URL to its validators (ETag / Last-Modified) and the hash of its body.
+CACHE_DIR = os.environ.get("CAPTURE_CACHE_DIR", ".capture_cache")
+# Default budget: 4 GB, enough for a handful of large Unity builds
+CACHE_MAX_BYTES = int(os.environ.get("CAPTURE_CACHE_MAX_BYTES", 4 * 1024 ** 3))
+
+# Hop-by-hop / transport headers that must not be replayed from the cache, plus
+# set-cookie so stale session cookies from an earlier run are never handed back
+SKIP_HEADERS = {'content-length', 'content-encoding', 'transfer-encoding', 'connection', 'keep-alive', 'set-cookie'}
+
+def is_cacheable(headers):
+    """Responses marked Cache-Control: no-store or private must not be kept on disk."""
+    lowered = {k.lower(): v for k, v in headers.items()}
+    directives = {d.strip().split('=')[0].lower() for d in lowered.get("cache-control", "").split(',')}
+    return not directives & {"no-store", "private"}
+
+class CaptureCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Cache index unreadable, starting fresh: {e}")
+            return {}
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest)
+
+    def lookup(self, url):
+        """Return the cache entry for url if its body is still on disk, else None."""
+        entry = self.index.get(url)
+        if entry and os.path.exists(self._blob_path(entry["sha256"])):
+            return entry
+        return None
+
+    def conditional_headers(self, entry):
+        """Build revalidation headers (If-None-Match / If-Modified-Since) for a cached entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["if-none-match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["if-modified-since"] = entry["last_modified"]
+        return headers
+
+    def read(self, entry):
+        entry["last_access"] = time.time()
+        with open(self._blob_path(entry["sha256"]), 'rb') as f:
+            return f.read()
+
+    def store(self, url, status, headers, body):
+        """Store a 200 response body, deduplicated by its SHA-256. Returns False if not cacheable."""
+        if not is_cacheable(headers):
+            # Forget any earlier copy too; evict() reclaims its now-orphaned blob
+            self.index.pop(url, None)
+            return False
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            tmp_path = blob_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, blob_path)
+
+        previous = self.index.get(url)
+        lowered = {k.lower(): v for k, v in headers.items()}
+        self.index[url] = {
+            "sha256": digest,
+            "size": len(body),
+            "status": status,
+            "headers": {k: v for k, v in lowered.items() if k not in SKIP_HEADERS},
+            "etag": lowered.get("etag"),
+            "last_modified": lowered.get("last-modified"),
+            # The stored body is decoded; remember whether the wire bytes were encoded
+            "content_encoding": lowered.get("content-encoding", "identity").strip().lower(),
+            "last_access": time.time(),
+        }
+
+        # The URL's content changed: drop the superseded body unless another URL still uses it
+        if previous and previous["sha256"] != digest:
+            if not any(e["sha256"] == previous["sha256"] for e in self.index.values()):
+                self._remove_blob(previous["sha256"])
+        return True
+
+    def _remove_blob(self, name):
+        try:
+            os.remove(self._blob_path(name))
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """Drop orphaned blobs, then least-recently-used ones until the cache fits in max_bytes."""
+        # Several URLs can share one blob; a blob's recency is that of its most recent URL
+        recency = {}
+        for entry in self.index.values():
+            recency[entry["sha256"]] = max(recency.get(entry["sha256"], 0), entry["last_access"])
+
+        # Sizes come from the blobs/ directory itself, so nothing on disk escapes the cap
+        blobs = {}
+        for name in os.listdir(self.blob_dir):
+            if name.endswith(".tmp") or name not in recency:
+                # Leftovers of interrupted writes and bodies no URL points to any more
+                self._remove_blob(name)
+                continue
+            blobs[name] = os.path.getsize(self._blob_path(name))
+
+        # Index entries whose blob vanished can't be served
+        self.index = {url: e for url, e in self.index.items() if e["sha256"] in blobs}
+
+        total = sum(blobs.values())
+        if total <= self.max_bytes:
+            return
+
+        for digest in sorted(blobs, key=lambda d: recency[d]):
+            if total <= self.max_bytes:
+                break
+            self._remove_blob(digest)
+            total -= blobs[digest]
+            self.index = {url: e for url, e in self.index.items() if e["sha256"] != digest}
+            print(f"Cache evicted {digest[:12]} ({blobs[digest]} bytes)")
+
+    def save(self):
+        self.evict()
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+        print(f"Cache: {self.hits} served from disk, {self.misses} fetched ({len(self.index)} entries in {self.cache_dir})")
@@ -2,6 +2,7 @@ import json
 import os
 import base64
 from mitmproxy import http
+from range_assembly import RangeAssembler, raw_bytes_are_file
 
 # Path to save HAR file
 HAR_PATH = os.environ.get("HAR_CAPTURE_PATH", "capture.har")
@@ -9,6 +10,16 @@ HAR_PATH = os.environ.get("HAR_CAPTURE_PATH", "capture.har")
 class HARRecorder:
     def __init__(self):
         self.entries = []
+        # 206 ranges and streamed Unity build files are reassembled into manual_downloads
+        self.assembler = RangeAssembler()
+
+    def responseheaders(self, flow: http.HTTPFlow):
+        # Large bodies are streamed by mitmproxy (stream_large_bodies) and never reach
+        # response() with content, so tee their chunks to disk as they pass through.
+        if flow.response.stream:
+            writer = self.assembler.stream_writer(flow.request.url, flow.response.status_code, flow.response.headers)
+            if writer:
+                flow.response.stream = writer
 
     def response(self, flow: http.HTTPFlow):
         # We only care about successful responses to save
@@ -32,7 +43,16 @@ class HARRecorder:
         }
 
         # Handle content
-        if flow.response.content:
+        if flow.response.stream:
+            entry["response"]["content"]["comment"] = f"streamed body, reassembled into {self.assembler.output_dir}"
+        elif flow.response.content:
+            # Write the file's own bytes: the wire bytes when the encoding is the file's compression
+            # (game.data.br sent as Content-Encoding: br), otherwise the decoded body
+            if raw_bytes_are_file(flow.request.url, flow.response.headers):
+                body = flow.response.raw_content
+            else:
+                body = flow.response.content
+            self.assembler.add_response(flow.request.url, flow.response.status_code, flow.response.headers, body)
             try:
                 entry["response"]["content"]["text"] = flow.response.content.decode("utf-8")
             except UnicodeDecodeError:
@@ -43,6 +63,9 @@ class HARRecorder:
         self.entries.append(entry)
 
     def done(self):
+        for url, state in self.assembler.files.items():
+            print(f"Incomplete ranges for {url}: {state['covered']} of {state['total']}")
+
         har_data = {
             "log": {
                 "version": "1.2",
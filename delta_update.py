@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import sys
+from urllib.parse import unquote
+
+from extract_har import url_to_local_path, decode_content
+from organize import ORGANIZED_DIR, inject_patch_tag
+from range_assembly import ASSEMBLY_DIR, load_manifest, manual_files
+from range_assembly import organized_path as assembled_organized_path
+
+# Apply only what changed between two captures of the same game to an existing
+# organized build, instead of re-extracting and re-organizing everything.
+BLOCK_SIZE = 1024 * 1024
+# Files at least this large are patched block by block instead of rewritten
+BLOCK_DELTA_MIN_SIZE = 8 * BLOCK_SIZE
+
+def load_entries(har_path):
+    with open(har_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('log', {}).get('entries', [])
+
+def find_game_root(urls):
+    """Return the URL directory of the game, mirroring organize.py's choice of game root:
+    the folder holding index.html next to Build/ or TemplateData/."""
+    for url in urls:
+        if url.split('?')[0].endswith('/index.html'):
+            base = url.split('?')[0].rsplit('/', 1)[0] + '/'
+            if any(u.startswith(base + 'Build/') or u.startswith(base + 'TemplateData/') for u in urls):
+                return base
+    return None
+
+def organized_path(url, root_domain, root_dir):
+    """Path of url relative to the organized build, or None if it lives outside the game root."""
+    domain, local_path = url_to_local_path(url)
+    if domain != root_domain or not local_path.startswith(root_dir + os.sep):
+        return None
+    # organize.py unquotes every file and directory name (New%20folder.data -> New folder.data)
+    parts = local_path[len(root_dir) + 1:].split(os.sep)
+    return os.path.join(*[unquote(part) for part in parts])
+
+def declared_length(entry):
+    """The response's Content-Length, or None when it is absent or describes encoded bytes."""
+    headers = {h.get('name', '').lower(): h.get('value', '') for h in entry.get('response', {}).get('headers', [])}
+    length = headers.get('content-length', '').strip()
+    if not length.isdigit() or headers.get('content-encoding', 'identity').strip().lower() != 'identity':
+        return None
+    return int(length)
+
+def as_organized(body, rel_path):
+    if body and rel_path == "index.html":
+        # The organized index.html carries the offline patch tag; compare like with like
+        body = inject_patch_tag(body.decode('utf-8')).encode('utf-8')
+    return body
+
+def entry_body(entry, rel_path):
+    return as_organized(decode_content(entry.get('response', {}).get('content', {}), rel_path), rel_path)
+
+def scan_capture(entries):
+    """Scan a HAR's game files.
+
+    Returns (manifest, paths, root): manifest maps each organized path whose entry has a complete
+    body to {url, sha256, size, entry}; paths maps every 200 game-root path, body or not, to its URL;
+    root is the game root in the '<domain>/<path>' form used by manual_downloads/.
+    A body whose length disagrees with the response's Content-Length is incomplete and counts as missing.
+    """
+    urls = [e.get('request', {}).get('url', '') for e in entries]
+    root_url = find_game_root(urls)
+    if not root_url:
+        print("Could not find the game root (index.html next to Build/ or TemplateData/) in HAR.")
+        return {}, {}, None
+    root_domain, root_index = url_to_local_path(root_url + "index.html")
+    root_dir = os.path.dirname(root_index)
+
+    manifest = {}
+    paths = {}
+    for entry in entries:
+        url = entry.get('request', {}).get('url')
+        if not url or entry.get('response', {}).get('status') != 200:
+            continue
+        rel_path = organized_path(url, root_domain, root_dir)
+        if not rel_path:
+            continue
+        paths[rel_path] = url
+        body = decode_content(entry['response'].get('content', {}), rel_path)
+        # Entries without a body (streamed or missed by the HAR) carry no hash to compare
+        if not body:
+            continue
+        expected = declared_length(entry)
+        if expected is not None and len(body) != expected:
+            print(f"Warning: {url} has {len(body)} of {expected} bytes in the HAR; ignoring its body.")
+            continue
+        body = as_organized(body, rel_path)
+        manifest[rel_path] = {"url": url, "sha256": hashlib.sha256(body).hexdigest(), "size": len(body), "entry": entry}
+    return manifest, paths, "/".join([root_domain] + root_dir.split(os.sep))
+
+def build_manifest(entries):
+    """Hash manifest of the HAR's game files that have a body (see scan_capture)."""
+    return scan_capture(entries)[0]
+
+def add_manual(manifest, paths, assembly_dir=ASSEMBLY_DIR):
+    """Overlay files fetched whole into manual_downloads/ onto a HAR manifest.
+
+    organize.py merges these into Build/, and they are complete where the HAR body often is not,
+    so they replace the HAR's copy. Only names the capture lists under Build/ count.
+    """
+    for name, source in manual_files(assembly_dir).items():
+        rel_path = os.path.join("Build", name)
+        if rel_path in paths:
+            manifest[rel_path] = {"url": paths[rel_path], "sha256": hash_file(source), "size": os.path.getsize(source), "source": source}
+
+def add_assembled(manifest, paths, root, assembly_dir=ASSEMBLY_DIR):
+    """Overlay files reassembled during the capture (manual_downloads/) onto a HAR manifest.
+
+    Only files whose URL is part of this capture count; stale ones from earlier runs are ignored.
+    """
+    capture_urls = set(paths.values())
+    for path, info in load_manifest(assembly_dir).items():
+        rel_path = assembled_organized_path(path, root)
+        if rel_path and info["url"] in capture_urls:
+            source = os.path.join(assembly_dir, *path.split("/"))
+            if os.path.isfile(source):
+                manifest[rel_path] = {"url": info["url"], "sha256": info["sha256"], "size": info["size"], "source": source}
+
+def read_body(info, rel_path):
+    if "source" in info:
+        with open(info["source"], 'rb') as f:
+            return f.read()
+    return entry_body(info["entry"], rel_path)
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def diff_manifests(old, new, old_paths, new_paths):
+    added = sorted(p for p in new if p not in old)
+    changed = sorted(p for p in new if p in old and new[p]["sha256"] != old[p]["sha256"])
+    # Removal is decided by URL presence alone: a file the new HAR lists without a body still exists
+    removed = sorted(p for p in old_paths if p not in new_paths)
+    return added, changed, removed
+
+def diff_against_build(new, build_dir):
+    """Compare a HAR manifest with files already on disk. Nothing is ever reported as removed:
+    the build also holds files the HAR never had (manual_downloads, offline_patch.js)."""
+    added, changed = [], []
+    for rel_path, info in sorted(new.items()):
+        path = os.path.join(build_dir, rel_path)
+        if not os.path.isfile(path):
+            added.append(rel_path)
+        elif os.path.getsize(path) != info["size"] or hash_file(path) != info["sha256"]:
+            changed.append(rel_path)
+    return added, changed, []
+
+def write_blocks(path, data, block_size=BLOCK_SIZE):
+    """Rewrite only the blocks of path that differ from data (same-offset comparison).
+
+    Returns the number of bytes actually written.
+    """
+    view = memoryview(data)
+    written = 0
+    with open(path, 'r+b') as f:
+        for offset in range(0, len(data), block_size):
+            new_block = view[offset:offset + block_size]
+            f.seek(offset)
+            if f.read(len(new_block)) != new_block:
+                f.seek(offset)
+                f.write(new_block)
+                written += len(new_block)
+        f.truncate(len(data))
+    return written
+
+def write_file(path, data):
+    if os.path.isfile(path) and max(os.path.getsize(path), len(data)) >= BLOCK_DELTA_MIN_SIZE:
+        return write_blocks(path, data)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+def apply_delta(new_har, old_har=None, build_dir=ORGANIZED_DIR, dry_run=False, assembly_dir=ASSEMBLY_DIR):
+    if not os.path.isdir(build_dir):
+        print(f"Error: {build_dir} not found. Run organize.py once before applying deltas.")
+        return False
+
+    new, new_paths, root = scan_capture(load_entries(new_har))
+    # Precedence: HAR body < whole file in manual_downloads/ < file reassembled during capture
+    add_manual(new, new_paths, assembly_dir)
+    add_assembled(new, new_paths, root, assembly_dir)
+    for rel_path, url in sorted(new_paths.items()):
+        if rel_path not in new:
+            print(f"Warning: {url} has no complete body in the capture or manual_downloads/; {rel_path} left as is.")
+
+    if old_har:
+        print(f"Comparing {old_har} -> {new_har}")
+        old, old_paths, _ = scan_capture(load_entries(old_har))
+        added, changed, removed = diff_manifests(old, new, old_paths, new_paths)
+    else:
+        print(f"Comparing {new_har} -> {build_dir}")
+        added, changed, removed = diff_against_build(new, build_dir)
+
+    print(f"{len(added)} added, {len(changed)} changed, {len(removed)} removed ({len(new)} files in capture)")
+    if dry_run:
+        for label, paths in (("+", added), ("~", changed), ("-", removed)):
+            for rel_path in paths:
+                print(f" {label} {rel_path}")
+        return True
+
+    written = 0
+    for rel_path in added + changed:
+        info = new[rel_path]
+        path = os.path.join(build_dir, rel_path)
+        bytes_written = write_file(path, read_body(info, rel_path))
+        written += bytes_written
+        print(f" {'+' if rel_path in added else '~'} {rel_path} ({bytes_written} of {info['size']} bytes written)")
+    for rel_path in removed:
+        path = os.path.join(build_dir, rel_path)
+        if os.path.isfile(path):
+            os.remove(path)
+            print(f" - {rel_path}")
+
+    total = sum(info["size"] for info in new.values())
+    print(f"Delta applied: {written} bytes written (full rebuild would write {total}).")
+    return True
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--dry-run"]
+    if len(args) < 1:
+        print("Usage: python3 delta_update.py <new.har> [old.har] [--dry-run]")
+        print("Without old.har, the new capture is compared against the files in organized_src/.")
+        sys.exit(1)
+
+    ok = apply_delta(args[0], args[1] if len(args) > 1 else None, dry_run="--dry-run" in sys.argv)
+    sys.exit(0 if ok else 1)
@@ -33,6 +33,79 @@ def is_binary_content(path, mime_type):
                 return True
     return False
 
+def fnv1a_hash(string):
+    """Simple FNV-1a hash, easy to reimplement in JS."""
+    hash_val = 0x811c9dc5
+    for char in string:
+        hash_val ^= ord(char)
+        hash_val *= 0x01000193
+        hash_val &= 0xffffffff
+    return hex(hash_val)[2:]
+
+def url_to_local_path(url):
+    """Map a URL to (domain, local_path) the way extract_har lays files out under src/."""
+    parsed_url = urlparse(url)
+    path = parsed_url.path
+    query = parsed_url.query
+
+    if query:
+        query_hash = fnv1a_hash(query)
+
+        # Append hash to the path to ensure uniqueness
+        if path.endswith('/'):
+             path = path.rstrip('/') + "_" + query_hash
+        else:
+            root, ext = os.path.splitext(path)
+            # Keep extension at the end if it exists and looks like a real file extension (short)
+            if ext and len(ext) < 10: 
+                path = f"{root}_{query_hash}{ext}"
+            else:
+                path = f"{path}_{query_hash}"
+
+    if path == "/" or path == "":
+        path = "/index.html"
+
+    # Split path into components and sanitize each one
+    # Some URLs have extremely long segments that violate filesystem limits (usually 255 bytes)
+    parts = path.strip('/').split('/')
+    safe_parts = []
+    for part in parts:
+        if len(part) > 150:  # Safety margin below 255
+            # Create a safe simplified name: first 100 chars + hash of full name
+            import hashlib
+            part_hash = hashlib.md5(part.encode('utf-8')).hexdigest()[:8]
+            safe_part = f"{part[:100]}_{part_hash}"
+            safe_parts.append(safe_part)
+        else:
+            safe_parts.append(part)
+
+    local_path = os.path.join(*safe_parts) if safe_parts else "index.html"
+
+    return parsed_url.netloc, local_path
+
+def decode_content(content, local_path):
+    """Return the response body of a HAR content object as bytes, or None if it has none."""
+    content_text = content.get('text')
+    encoding = content.get('encoding')
+    mime_type = content.get('mimeType', '')
+
+    if not content_text:
+        return None
+    # Check if content is base64 encoded
+    if encoding == 'base64':
+        return base64.b64decode(content_text)
+    # Check if this is binary content that was UTF-8 encoded in HAR
+    if is_binary_content(local_path, mime_type):
+        # Recover binary data by encoding text as latin-1
+        # This reverses the UTF-8 decoding that happened during HAR creation
+        try:
+            return content_text.encode('latin-1')
+        except UnicodeEncodeError:
+            # Fallback: encode as UTF-8 if latin-1 fails
+            return content_text.encode('utf-8')
+    # Text content
+    return content_text.encode('utf-8')
+
 def extract_har(har_path, output_dir="src"):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
@@ -55,54 +128,9 @@ def extract_har(har_path, output_dir="src"):
         if not url or not response:
             continue
 
-        parsed_url = urlparse(url)
-        path = parsed_url.path
-        query = parsed_url.query
-
-        if query:
-            # Use a simple FNV-1a hash for easy JS implementation
-            def fnv1a_hash(string):
-                hash_val = 0x811c9dc5
-                for char in string:
-                    hash_val ^= ord(char)
-                    hash_val *= 0x01000193
-                    hash_val &= 0xffffffff
-                return hex(hash_val)[2:]
-
-            query_hash = fnv1a_hash(query)
-            
-            # Append hash to the path to ensure uniqueness
-            if path.endswith('/'):
-                 path = path.rstrip('/') + "_" + query_hash
-            else:
-                root, ext = os.path.splitext(path)
-                # Keep extension at the end if it exists and looks like a real file extension (short)
-                if ext and len(ext) < 10: 
-                    path = f"{root}_{query_hash}{ext}"
-                else:
-                    path = f"{path}_{query_hash}"
-
-        if path == "/" or path == "":
-            path = "/index.html"
-        
-        # Split path into components and sanitize each one
-        # Some URLs have extremely long segments that violate filesystem limits (usually 255 bytes)
-        parts = path.strip('/').split('/')
-        safe_parts = []
-        for part in parts:
-            if len(part) > 150:  # Safety margin below 255
-                # Create a safe simplified name: first 100 chars + hash of full name
-                import hashlib
-                part_hash = hashlib.md5(part.encode('utf-8')).hexdigest()[:8]
-                safe_part = f"{part[:100]}_{part_hash}"
-                safe_parts.append(safe_part)
-            else:
-                safe_parts.append(part)
-        
-        local_path = os.path.join(*safe_parts) if safe_parts else "index.html"
-        
+        domain, local_path = url_to_local_path(url)
+
         # Construct full output path
-        domain = parsed_url.netloc
         full_output_path = os.path.join(output_dir, domain, local_path)
 
         # Handle directory creation with conflict resolution
@@ -144,37 +172,15 @@ def extract_har(har_path, output_dir="src"):
              full_output_path = os.path.join(full_output_path, "index.html")
 
 
-        content = response.get('content', {})
-        content_text = content.get('text')
-        encoding = content.get('encoding')
-        mime_type = content.get('mimeType', '')
-
-        if content_text:
-            try:
-                # Check if content is base64 encoded
-                if encoding == 'base64':
-                    content_bytes = base64.b64decode(content_text)
-                    with open(full_output_path, 'wb') as out_file:
-                        out_file.write(content_bytes)
-                # Check if this is binary content that was UTF-8 encoded in HAR
-                elif is_binary_content(local_path, mime_type):
-                    # Recover binary data by encoding text as latin-1
-                    # This reverses the UTF-8 decoding that happened during HAR creation
-                    try:
-                        content_bytes = content_text.encode('latin-1')
-                    except UnicodeEncodeError:
-                        # Fallback: encode as UTF-8 if latin-1 fails
-                        content_bytes = content_text.encode('utf-8')
-                    with open(full_output_path, 'wb') as out_file:
-                        out_file.write(content_bytes)
-                else:
-                    # Text content - write as text
-                    with open(full_output_path, 'w', encoding='utf-8') as out_file:
-                        out_file.write(content_text)
+        try:
+            content_bytes = decode_content(response.get('content', {}), local_path)
+            if content_bytes:
+                with open(full_output_path, 'wb') as out_file:
+                    out_file.write(content_bytes)
                 
                 print(f"Extracted: {full_output_path}")
-            except Exception as e:
-                print(f"Failed to save {full_output_path}: {e}")
+        except Exception as e:
+            print(f"Failed to save {full_output_path}: {e}")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -1,6 +1,5 @@
 import os
 import re
-import requests
 from urllib.parse import urlparse
 
 # Base directory for organized assets
@@ -8,6 +7,8 @@ BASE_DIR = "organized_src"
 HTML_FILE = os.path.join(BASE_DIR, "index.html")
 
 def download_asset(url, local_path):
+    # Imported lazily so `itchscraper` subcommands that don't download stay fast to start
+    import requests
     try:
         response = requests.get(url, timeout=10)
         if response.status_code == 200:
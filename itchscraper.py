@@ -0,0 +1,233 @@
+import time
+_START = time.perf_counter()
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import socket
+import sys
+
+# Unified entry point for the pipeline tools.
+# Heavy dependencies (Playwright, requests) are only imported by the subcommand that
+# needs them, and `daemon` keeps one interpreter warm so batch jobs skip startup entirely.
+DEFAULT_SOCKET = os.environ.get("ITCHSCRAPER_SOCKET", ".itchscraper.sock")
+TIMINGS_LOG = os.environ.get("ITCHSCRAPER_TIMINGS_LOG", "startup_timings.jsonl")
+
+# Seconds spent importing each tool module in this process (see _load)
+_import_times = {}
+
+def _load(module_name):
+    """Import a tool module on demand, recording how long the import took."""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _import_times[module_name] = time.perf_counter() - start
+    return module
+
+def cmd_capture(args):
+    import asyncio
+    better_capture = _load("better_capture")
+    asyncio.run(better_capture.run(args.url, args.output, use_cache=not args.no_cache))
+
+def cmd_extract(args):
+    _load("extract_har").extract_har(args.har, args.output_dir)
+
+def cmd_organize(args):
+    _load("organize").main()
+
+def cmd_fetch_assets(args):
+    _load("fetch_assets").fix_assets()
+
+def cmd_process(args):
+    _load("process_site").main(args.har)
+
+def cmd_delta(args):
+    ok = _load("delta_update").apply_delta(args.new_har, args.old_har, args.build_dir, dry_run=args.dry_run)
+    sys.exit(0 if ok else 1)
+
+def cmd_verify(args):
+    ok = _load("verify_build").verify_build(args.build_dir, args.har)
+    sys.exit(0 if ok else 1)
+
+def cmd_daemon(args):
+    serve(args.socket)
+
+def cmd_submit(args):
+    job_argv = args.job_argv[1:] if args.job_argv[:1] == ["--"] else args.job_argv
+    result = submit(job_argv, args.socket)
+    sys.stdout.write(result["output"])
+    sys.exit(result["exit_code"])
+
+def cmd_timings(args):
+    if not os.path.exists(TIMINGS_LOG):
+        print(f"No timings recorded yet ({TIMINGS_LOG}). Run a subcommand with --timings first.")
+        return
+    by_command = {}
+    with open(TIMINGS_LOG, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            by_command.setdefault(record["command"], []).append(record["startup_ms"] + record["import_ms"])
+    print(f"{'command':<14} {'runs':>5} {'median ms':>10} {'latest ms':>10}")
+    for command, samples in sorted(by_command.items()):
+        median = sorted(samples)[len(samples) // 2]
+        print(f"{command:<14} {len(samples):>5} {median:>10.1f} {samples[-1]:>10.1f}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="itchscraper", description="Capture and rebuild itch.io Unity WebGL games for offline play.")
+    parser.add_argument("--timings", action="store_true", help=f"Print startup/import time and append it to {TIMINGS_LOG}")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("capture", help="Capture a game page into a HAR (better_capture.py)")
+    p.add_argument("url")
+    p.add_argument("output", nargs="?", default="capture.har")
+    p.add_argument("--no-cache", action="store_true", help="Bypass the on-disk capture cache")
+    p.set_defaults(func=cmd_capture)
+
+    p = sub.add_parser("extract", help="Extract assets from a HAR (extract_har.py)")
+    p.add_argument("har")
+    p.add_argument("--output-dir", default="src")
+    p.set_defaults(func=cmd_extract)
+
+    p = sub.add_parser("organize", help="Build organized_src/ from src/ (organize.py)")
+    p.set_defaults(func=cmd_organize)
+
+    p = sub.add_parser("fetch-assets", help="Download and relink CDN assets in organized_src/index.html (fetch_assets.py)")
+    p.set_defaults(func=cmd_fetch_assets)
+
+    p = sub.add_parser("process", help="Extract and organize in one step (process_site.py)")
+    p.add_argument("har", nargs="?", default="new_capture.har")
+    p.set_defaults(func=cmd_process)
+
+    p = sub.add_parser("delta", help="Apply only the changes in a new capture to an organized build (delta_update.py)")
+    p.add_argument("new_har")
+    p.add_argument("old_har", nargs="?", help="Previous capture; defaults to comparing against the build on disk")
+    p.add_argument("--build-dir", default="organized_src")
+    p.add_argument("--dry-run", action="store_true", help="Only list added/changed/removed files")
+    p.set_defaults(func=cmd_delta)
+
+    p = sub.add_parser("verify", help="Check organized_src/ against capture-time hashes and Unity headers (verify_build.py)")
+    p.add_argument("har", nargs="?", help="Capture to verify against; without it only recorded downloads and headers are checked")
+    p.add_argument("--build-dir", default="organized_src")
+    p.set_defaults(func=cmd_verify)
+
+    p = sub.add_parser("daemon", help="Keep an interpreter warm and run jobs sent over a local socket")
+    p.add_argument("--socket", default=DEFAULT_SOCKET)
+    p.set_defaults(func=cmd_daemon)
+
+    p = sub.add_parser("submit", help="Run a subcommand inside a running daemon, e.g. submit -- extract game.har")
+    p.add_argument("--socket", default=DEFAULT_SOCKET)
+    p.add_argument("job_argv", nargs=argparse.REMAINDER)
+    p.set_defaults(func=cmd_submit)
+
+    p = sub.add_parser("timings", help=f"Summarize recorded startup times from {TIMINGS_LOG}")
+    p.set_defaults(func=cmd_timings)
+
+    return parser
+
+def record_timing(command, startup):
+    import_ms = sum(_import_times.values()) * 1000
+    record = {"command": command, "startup_ms": round(startup * 1000, 2), "import_ms": round(import_ms, 2), "timestamp": time.time()}
+    print(f"[timings] {command}: startup {record['startup_ms']} ms, imports {record['import_ms']} ms", file=sys.stderr)
+    with open(TIMINGS_LOG, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + "\n")
+
+def main(argv=None, start=None):
+    args = build_parser().parse_args(argv)
+    startup = time.perf_counter() - (_START if start is None else start)
+    _import_times.clear()
+    try:
+        args.func(args)
+    finally:
+        if args.timings:
+            record_timing(args.command, startup)
+
+def run_job(job):
+    """Run one daemon job in-process, returning its exit code and captured output."""
+    start = time.perf_counter()
+    output = io.StringIO()
+    previous_cwd = os.getcwd()
+    exit_code = 0
+    try:
+        os.chdir(job.get("cwd", previous_cwd))
+    except OSError as e:
+        return {"exit_code": 1, "output": f"Bad job cwd: {e}\n"}
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            try:
+                main(job["argv"], start=start)
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception as e:
+                print(f"Job failed: {e}")
+                exit_code = 1
+    finally:
+        os.chdir(previous_cwd)
+    return {"exit_code": exit_code, "output": output.getvalue()}
+
+def handle_connection(conn):
+    """Read one job from conn, run it and write back the result."""
+    with conn, conn.makefile('rw', encoding='utf-8') as stream:
+        line = stream.readline()
+        if not line:
+            return
+        try:
+            job = json.loads(line)
+            argv = job["argv"]
+            if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+                raise TypeError("argv must be a list of strings")
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            result = {"exit_code": 2, "output": f"Bad job: {e}\n"}
+        else:
+            command = next((a for a in argv if not a.startswith("-")), None)
+            if command in ("daemon", "submit"):
+                result = {"exit_code": 2, "output": "Refusing to nest daemon/submit inside the daemon.\n"}
+            else:
+                print(f"Job: {' '.join(argv)}")
+                result = run_job(job)
+        stream.write(json.dumps(result) + "\n")
+        stream.flush()
+
+def serve(socket_path=DEFAULT_SOCKET):
+    """Accept newline-delimited JSON jobs ({"argv": [...], "cwd": "..."}) one at a time."""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+    print(f"itchscraper daemon listening on {socket_path} (startup {(time.perf_counter() - _START) * 1000:.1f} ms)")
+    try:
+        while True:
+            conn, _ = server.accept()
+            # One bad job or a client that hangs up early must not take the daemon down
+            try:
+                handle_connection(conn)
+            except Exception as e:
+                print(f"Connection error: {e}")
+    except KeyboardInterrupt:
+        print("Daemon stopped.")
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+def submit(job_argv, socket_path=DEFAULT_SOCKET):
+    """Send one job to a running daemon and wait for its result."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        try:
+            conn.connect(socket_path)
+        except OSError as e:
+            return {"exit_code": 1, "output": f"Could not reach daemon at {socket_path}: {e}\n"}
+        with conn.makefile('rw', encoding='utf-8') as stream:
+            stream.write(json.dumps({"argv": job_argv, "cwd": os.getcwd()}) + "\n")
+            stream.flush()
+            reply = stream.readline()
+        if not reply:
+            return {"exit_code": 1, "output": f"Daemon at {socket_path} closed the connection without a result.\n"}
+        return json.loads(reply)
+
+if __name__ == "__main__":
+    main()
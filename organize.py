@@ -2,9 +2,21 @@ import os
 import shutil
 import glob
 
+from range_assembly import load_manifest, manual_files, organized_path
+
 ORGANIZED_DIR = "organized_src"
 SRC_ROOT = "src"
 
+def inject_patch_tag(html):
+    """Add the offline_patch.js <script> tag to index.html content (no-op if already present)."""
+    if "offline_patch.js" in html:
+        return html
+    # Inject before the first <script> or at end of <head>
+    replacement = '<script src="offline_patch.js"></script>\n    <script>'
+    if '<script>' in html:
+         return html.replace('<script>', replacement, 1) # Only first occurrence
+    return html.replace('</head>', '<script src="offline_patch.js"></script></head>')
+
 def main():
     print("=== Organizing Unity WebGL Capture ===")
     
@@ -71,11 +83,20 @@ def main():
         build_dir = os.path.join(ORGANIZED_DIR, "Build")
         if os.path.exists(manual_dir) and os.path.exists(build_dir):
             print(f"Merging manual downloads from {manual_dir} to {build_dir}...")
-            for manual_file in os.listdir(manual_dir):
-                src_file = os.path.join(manual_dir, manual_file)
-                if os.path.isfile(src_file):
-                    shutil.copy2(src_file, build_dir)
-                    print(f" - Copied {manual_file}")
+            for manual_file, src_file in sorted(manual_files(manual_dir).items()):
+                shutil.copy2(src_file, build_dir)
+                print(f" - Copied {manual_file}")
+
+        # Files reassembled during capture keep their URL layout; put each at its real path
+        root_rel = os.path.relpath(game_root, SRC_ROOT).replace(os.sep, "/")
+        for rel_path in load_manifest(manual_dir):
+            dest_rel = organized_path(rel_path, root_rel)
+            src_file = os.path.join(manual_dir, *rel_path.split("/"))
+            if dest_rel and os.path.isfile(src_file):
+                dest_file = os.path.join(ORGANIZED_DIR, dest_rel)
+                os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+                shutil.copy2(src_file, dest_file)
+                print(f" - Copied reassembled {dest_rel}")
 
     else:
         print("CRITICAL: Could not define a source root. Check 'src' folder structure.")
@@ -196,12 +217,7 @@ def main():
             html = f.read()
             
         if "offline_patch.js" not in html:
-            # Inject before the first <script> or at end of <head>
-            replacement = '<script src="offline_patch.js"></script>\n    <script>'
-            if '<script>' in html:
-                 html = html.replace('<script>', replacement, 1) # Only first occurrence
-            else:
-                 html = html.replace('</head>', '<script src="offline_patch.js"></script></head>')
+            html = inject_patch_tag(html)
             
             with open(index_file, "w") as f:
                 f.write(html)
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import re
+from urllib.parse import urlparse, unquote
+
+from extract_har import url_to_local_path
+
+# Reassembles 206 Partial Content and streamed responses into complete files
+# while the capture is running, so large Unity binaries are written exactly once
+# and don't need a second download after the HAR is saved.
+ASSEMBLY_DIR = os.environ.get("HAR_ASSEMBLY_DIR", "manual_downloads")
+
+# Size and SHA-256 of every file completed by the latest capture, keyed by its path under
+# ASSEMBLY_DIR; recorded for organize.py, delta_update.py and verify_build.py
+MANIFEST_NAME = ".assembled.json"
+
+CONTENT_RANGE_RE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+def parse_content_range(value):
+    """Parse 'bytes 0-999/5000' into (start, end_exclusive, total). total is None when '*'."""
+    match = CONTENT_RANGE_RE.match(value or "")
+    if not match:
+        return None
+    start, end, total = match.groups()
+    return int(start), int(end) + 1, None if total == "*" else int(total)
+
+def is_build_asset(url):
+    """Unity build files (Build/*.data, *.wasm, ...) are the ones the HAR tends to lose."""
+    return "/Build/" in urlparse(url).path
+
+def content_encoding(headers):
+    lowered = {k.lower(): v for k, v in headers.items()}
+    return (lowered.get("content-encoding") or "identity").strip().lower()
+
+def raw_bytes_are_file(url, headers):
+    """True when the bytes on the wire are the file itself: no Content-Encoding, or one matching
+    the file's own compression (Unity's game.data.br served with Content-Encoding: br)."""
+    encoding = content_encoding(headers)
+    path = urlparse(url).path
+    return (encoding == "identity"
+            or (encoding == "br" and path.endswith(".br"))
+            or (encoding in ("gzip", "x-gzip") and path.endswith(".gz")))
+
+def assembled_path(url):
+    """'<domain>/<path>' for url, the same layout extract_har uses under src/ ('/'-separated)."""
+    domain, local_path = url_to_local_path(url)
+    return "/".join([domain] + local_path.split(os.sep))
+
+def load_manifest(assembly_dir=ASSEMBLY_DIR):
+    path = os.path.join(assembly_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def manual_files(assembly_dir=ASSEMBLY_DIR):
+    """Files fetched whole into the top of assembly_dir (better_capture.py's curl fallback), by name.
+
+    organize.py merges these into Build/. Unfinished .part files and dotfiles (capture metadata) are skipped.
+    """
+    if not os.path.isdir(assembly_dir):
+        return {}
+    files = {}
+    for name in os.listdir(assembly_dir):
+        path = os.path.join(assembly_dir, name)
+        if os.path.isfile(path) and not name.endswith(".part") and not name.startswith("."):
+            files[name] = path
+    return files
+
+def guess_game_root(manifest):
+    """The '<domain>/<path>' game root of the assembled Unity build: the folder holding Build/."""
+    for path in manifest:
+        if "/Build/" in path:
+            return path.split("/Build/")[0]
+    return None
+
+def organized_path(path, game_root):
+    """Map an assembled path to its place in organized_src/ (None if outside the game root).
+
+    organize.py unquotes every name, so 'New%20folder.data' becomes 'New folder.data'.
+    """
+    if not game_root or not path.startswith(game_root + "/"):
+        return None
+    return os.path.join(*[unquote(part) for part in path[len(game_root) + 1:].split("/")])
+
+class RangeAssembler:
+    def __init__(self, output_dir=ASSEMBLY_DIR):
+        self.output_dir = output_dir
+        self.files = {}
+        self.completed = set()
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        # Each capture starts a fresh manifest, so it never lists files from an earlier game
+        self.manifest = {}
+        os.makedirs(output_dir, exist_ok=True)
+        self._save_manifest()
+
+    def _state(self, url, total):
+        state = self.files.get(url)
+        if state is None:
+            # Keyed by the URL's full path so equal basenames from different folders can't collide
+            rel_path = assembled_path(url)
+            path = os.path.join(self.output_dir, *rel_path.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            state = {"rel_path": rel_path, "path": path, "part": path + ".part", "total": total, "covered": []}
+            # Start from an empty .part file; ranges are written in place at their offsets
+            open(state["part"], 'wb').close()
+            self.files[url] = state
+        elif state["total"] is None:
+            state["total"] = total
+        return state
+
+    def _mark(self, state, start, end):
+        # Merge [start, end) into the sorted list of covered intervals
+        merged = []
+        for a, b in sorted(state["covered"] + [(start, end)]):
+            if merged and a <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+            else:
+                merged.append((a, b))
+        state["covered"] = merged
+
+    def _finish_if_complete(self, url, state):
+        total = state["total"]
+        if total is not None and state["covered"] == [(0, total)]:
+            os.replace(state["part"], state["path"])
+            del self.files[url]
+            self.completed.add(url)
+            self._record(url, state, total)
+            print(f"Reassembled: {url} -> {state['path']} ({total} bytes)")
+            return state["path"]
+        return None
+
+    def _record(self, url, state, size):
+        digest = hashlib.sha256()
+        with open(state["path"], 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        self.manifest[state["rel_path"]] = {"url": url, "size": size, "sha256": digest.hexdigest()}
+        self._save_manifest()
+
+    def _save_manifest(self):
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+
+    def write_range(self, url, start, data, total):
+        """Write data at offset start of url's file. Returns the final path once the file is complete."""
+        if not data:
+            return None
+        state = self._state(url, total)
+        with open(state["part"], 'r+b') as f:
+            f.seek(start)
+            f.write(data)
+        self._mark(state, start, start + len(data))
+        return self._finish_if_complete(url, state)
+
+    def add_response(self, url, status, headers, body):
+        """Feed a fully buffered response. Handles 206 ranges and whole 200 build files."""
+        if status == 206:
+            if url in self.completed:
+                # Already complete this run; a late range must not restart it as a fresh .part
+                return None
+            lowered = {k.lower(): v for k, v in headers.items()}
+            parsed = parse_content_range(lowered.get("content-range"))
+            if parsed:
+                start, _, total = parsed
+                return self.write_range(url, start, body, total)
+        elif status == 200 and is_build_asset(url) and body:
+            if url in self.files:
+                # A full response supersedes any partial ranges seen earlier
+                del self.files[url]
+            return self.write_range(url, 0, body, len(body))
+        return None
+
+    def stream_writer(self, url, status, headers):
+        """Return a mitmproxy-style stream callable that tees body chunks into the assembled file.
+
+        mitmproxy calls it with each chunk and finally with b"" at end of stream.
+        Returns None when the response isn't worth assembling.
+        """
+        # Stream chunks are the wire bytes; only tee them when those are the file's bytes
+        if not raw_bytes_are_file(url, headers):
+            return None
+        lowered = {k.lower(): v for k, v in headers.items()}
+        if status == 206:
+            if url in self.completed:
+                return None
+            parsed = parse_content_range(lowered.get("content-range"))
+            if not parsed:
+                return None
+            offset, _, total = parsed
+        elif status == 200 and is_build_asset(url):
+            offset = 0
+            length = lowered.get("content-length")
+            total = int(length) if length and length.isdigit() else None
+        else:
+            return None
+
+        position = [offset]
+
+        def stream(data):
+            if data:
+                self.write_range(url, position[0], data, total)
+                position[0] += len(data)
+            elif total is None and status == 200 and url in self.files:
+                # Chunked 200 without Content-Length: the end of stream gives us the size
+                state = self.files[url]
+                state["total"] = position[0]
+                self._finish_if_complete(url, state)
+            return data
+
+        return stream
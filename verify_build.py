@@ -0,0 +1,192 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from organize import ORGANIZED_DIR
+from range_assembly import ASSEMBLY_DIR, load_manifest, guess_game_root, organized_path
+
+# Checks that organized_src/ is complete and uncorrupted before anyone opens it in a browser:
+# hashes every file in parallel against the sizes/hashes recorded at capture time (HAR bodies
+# and manual_downloads/.assembled.json), and validates Unity magic bytes and headers.
+WORKERS = min(32, (os.cpu_count() or 1) * 2)
+
+WASM_MAGIC = b"\0asm"
+UNITY_DATA_MAGIC = b"UnityWebData1.0\0"
+GZIP_MAGIC = b"\x1f\x8b"
+# Binaries that went through extract_har's UTF-8 fallback are full of U+FFFD replacement
+# characters; random binary data has roughly one per 16 MB
+MANGLED_MARKER = b"\xef\xbf\xbd"
+MANGLED_THRESHOLD = 64
+SNIFF_BYTES = 1024 * 1024
+UNITY_BINARY_EXTENSIONS = ('.gz', '.br', '.wasm', '.data', '.unityweb')
+
+def expected_from_har(har_path, assembly_dir=ASSEMBLY_DIR):
+    """Every 200 game-root URL in the HAR is required in the build. Returns (expected, root):
+    expected maps each organized path to {size, sha256}, or None when there is no complete copy.
+
+    Whole files in manual_downloads/ replace the HAR's body, as they do in organize.py, and a
+    body that disagrees with its Content-Length is not trusted (see delta_update.scan_capture).
+    """
+    from delta_update import scan_capture, load_entries, add_manual
+    manifest, paths, root = scan_capture(load_entries(har_path))
+    add_manual(manifest, paths, assembly_dir)
+    expected = {rel: None for rel in paths}
+    expected.update({rel: {"size": info["size"], "sha256": info["sha256"]} for rel, info in manifest.items()})
+    return expected, root
+
+def expected_from_assembly(assembly_dir=ASSEMBLY_DIR, game_root=None):
+    """Files reassembled during capture, at the paths organize.py copies them to."""
+    manifest = load_manifest(assembly_dir)
+    game_root = game_root or guess_game_root(manifest)
+    expected = {}
+    for path, info in manifest.items():
+        rel_path = organized_path(path, game_root)
+        if rel_path:
+            expected[rel_path] = info
+    return expected
+
+def inner_name(name):
+    """'game.wasm.gz' -> 'game.wasm'; compressed Unity files keep the real extension inside."""
+    for ext in ('.gz', '.br', '.unityweb'):
+        if name.endswith(ext):
+            return name[:-len(ext)]
+    return name
+
+def check_unity_data(buf, size):
+    """Validate an uncompressed UnityWebData header and that every file it lists fits in the file."""
+    if len(buf) < 20:
+        return "truncated UnityWebData header"
+    header_size = struct.unpack_from('<I', buf, 16)[0]
+    if header_size > len(buf):
+        return f"UnityWebData header claims {header_size} bytes, only {len(buf)} available"
+    pos = 20
+    while pos + 12 <= header_size:
+        offset, length, name_len = struct.unpack_from('<III', buf, pos)
+        pos += 12 + name_len
+        if offset + length > size:
+            name = bytes(buf[pos - name_len:pos]).decode('utf-8', 'replace')
+            return f"truncated: '{name}' ends at {offset + length}, file is {size} bytes"
+    return None
+
+def check_inner(name, head):
+    """Check the magic bytes of decompressed content against the inner file type."""
+    name = inner_name(name)
+    if name.endswith('.wasm') and not head.startswith(WASM_MAGIC):
+        return "decompressed content is not WebAssembly"
+    if name.endswith('.data') and not head.startswith(UNITY_DATA_MAGIC):
+        return "decompressed content is not UnityWebData"
+    return None
+
+def check_magic(name, buf):
+    """Return a list of problems with the file's magic bytes / header (buf is the mapped file)."""
+    problems = []
+    if name.endswith('.gz'):
+        if not buf[:2] == GZIP_MAGIC:
+            problems.append("missing gzip magic bytes")
+        else:
+            try:
+                head = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(buf[:SNIFF_BYTES], 64)
+                problem = check_inner(name, head)
+                if problem:
+                    problems.append(problem)
+            except zlib.error as e:
+                problems.append(f"corrupt gzip stream: {e}")
+    elif name.endswith('.br'):
+        # Brotli has no magic bytes; only check the content if the optional module is present
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+        if brotli:
+            try:
+                head = brotli.Decompressor().process(bytes(buf[:SNIFF_BYTES]))
+                problem = check_inner(name, head)
+                if problem:
+                    problems.append(problem)
+            except brotli.error as e:
+                problems.append(f"corrupt brotli stream: {e}")
+    elif name.endswith('.wasm'):
+        if not buf[:4] == WASM_MAGIC:
+            problems.append("missing WebAssembly magic bytes")
+    elif name.endswith('.data'):
+        if not buf[:len(UNITY_DATA_MAGIC)] == UNITY_DATA_MAGIC:
+            problems.append("missing UnityWebData magic bytes")
+        else:
+            problem = check_unity_data(buf, len(buf))
+            if problem:
+                problems.append(problem)
+
+    if name.endswith(UNITY_BINARY_EXTENSIONS):
+        if buf[:SNIFF_BYTES].count(MANGLED_MARKER) >= MANGLED_THRESHOLD:
+            problems.append("looks text-mangled (many U+FFFD replacement characters)")
+    return problems
+
+def verify_file(build_dir, rel_path, expected):
+    """Hash and inspect one file. Returns (rel_path, size, problems)."""
+    path = os.path.join(build_dir, rel_path)
+    size = os.path.getsize(path)
+    problems = []
+    if expected and size != expected["size"]:
+        problems.append(f"size {size}, expected {expected['size']}")
+
+    if size == 0:
+        # Empty CSS/JS can be legitimate; an empty Unity binary or a file captured non-empty is not
+        if (expected and expected["size"] > 0) or rel_path.endswith(UNITY_BINARY_EXTENSIONS):
+            problems.append("empty file")
+        return rel_path, size, problems
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        # hashlib releases the GIL on large buffers, so threads hash files in parallel
+        if expected and not problems and hashlib.sha256(buf).hexdigest() != expected["sha256"]:
+            problems.append("content hash differs from capture")
+        problems.extend(check_magic(os.path.basename(rel_path), buf))
+    return rel_path, size, problems
+
+def verify_build(build_dir=ORGANIZED_DIR, har_path=None, assembly_dir=ASSEMBLY_DIR):
+    if not os.path.isdir(build_dir):
+        print(f"Error: {build_dir} not found.")
+        return False
+
+    start = time.monotonic()
+    expected, game_root = expected_from_har(har_path, assembly_dir) if har_path else ({}, None)
+    # Reassembled files are complete by construction and take precedence over partial HAR bodies
+    expected.update(expected_from_assembly(assembly_dir, game_root))
+
+    files = []
+    for root, dirs, names in os.walk(build_dir):
+        for name in names:
+            files.append(os.path.relpath(os.path.join(root, name), build_dir))
+
+    present = set(files)
+    missing = sorted(rel for rel in expected if rel not in present)
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(lambda rel: verify_file(build_dir, rel, expected.get(rel)), files))
+
+    failures = 0
+    for rel_path in missing:
+        failures += 1
+        print(f"MISSING  {rel_path}")
+    for rel_path, size, problems in sorted(results):
+        if problems:
+            failures += 1
+            print(f"FAIL     {rel_path}: {'; '.join(problems)}")
+
+    total_bytes = sum(size for _, size, _ in results)
+    checked = sum(1 for rel, _, _ in results if expected.get(rel))
+    elapsed = time.monotonic() - start
+    print(f"Verified {len(results)} files ({total_bytes / 1024 ** 2:.1f} MB, {checked} against capture hashes) in {elapsed:.2f}s: {failures} problem(s).")
+    return failures == 0
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print("Usage: python3 verify_build.py [capture.har] [build_dir]")
+        sys.exit(0)
+
+    har_file = sys.argv[1] if len(sys.argv) > 1 else None
+    build = sys.argv[2] if len(sys.argv) > 2 else ORGANIZED_DIR
+    sys.exit(0 if verify_build(build, har_file) else 1)